@@ -0,0 +1,143 @@
+"""
+Controle de admissão e descarte de carga para o endpoint de busca
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Set
+from fastapi import HTTPException, Request, status
+import config
+
+
+class AdmissionController:
+    """Limita buscas simultâneas (global e por cliente) com fila curta e limitada"""
+
+    def __init__(self, max_concurrent: int = config.SEARCH_MAX_CONCURRENT,
+                 max_per_client: int = config.SEARCH_MAX_PER_CLIENT,
+                 queue_size: int = config.SEARCH_QUEUE_SIZE,
+                 queue_timeout: float = config.SEARCH_QUEUE_TIMEOUT,
+                 retry_after: int = config.SEARCH_RETRY_AFTER,
+                 api_keys: Set[str] = config.SEARCH_API_KEYS):
+        self.max_concurrent = max_concurrent
+        self.max_per_client = max_per_client
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.api_keys = api_keys
+
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._clients: Dict[str, int] = {}
+
+        # Métricas
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.admitted_total = 0
+        self.shed_total: Dict[str, int] = {
+            "client_limit": 0,
+            "queue_full": 0,
+            "queue_timeout": 0,
+            "heavy": 0
+        }
+
+    def client_key(self, request: Request) -> str:
+        """
+        Identifica o cliente pela API key (header X-API-Key) ou pelo IP
+
+        Só são aceitas chaves configuradas em SEARCH_API_KEYS; chaves
+        desconhecidas são ignoradas para não permitir contornar o limite por IP.
+        """
+        api_key = request.headers.get("x-api-key")
+        if api_key and api_key in self.api_keys:
+            return f"key:{api_key}"
+        host = request.client.host if request.client else "unknown"
+        return f"ip:{host}"
+
+    def _reject(self, reason: str, status_code: int, detail: str):
+        """Contabiliza o descarte e gera a resposta com Retry-After"""
+        self.shed_total[reason] += 1
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+    @asynccontextmanager
+    async def admit(self, client: str, heavy: bool = False, heavy_detail: Optional[str] = None):
+        """
+        Reserva uma vaga de busca para o cliente
+
+        Args:
+            client: Chave do cliente (ver client_key)
+            heavy: Busca cara; é descartada em vez de aguardar na fila
+            heavy_detail: Mensagem de erro quando a requisição cara é descartada
+
+        Raises:
+            HTTPException: 429 se o cliente excedeu seu limite,
+                503 se o serviço está sobrecarregado
+        """
+        if self._clients.get(client, 0) >= self.max_per_client:
+            self._reject(
+                "client_limit",
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Muitas buscas simultâneas para este cliente. Tente novamente em instantes."
+            )
+
+        pending = self.in_flight + self.queue_depth
+        if pending >= self.max_concurrent:
+            if heavy:
+                self._reject(
+                    "heavy",
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    heavy_detail or "Serviço sobrecarregado. Tente novamente em instantes."
+                )
+            if pending >= self.max_concurrent + self.queue_size:
+                self._reject(
+                    "queue_full",
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "Serviço sobrecarregado. Tente novamente em instantes."
+                )
+
+        self._clients[client] = self._clients.get(client, 0) + 1
+        try:
+            self.queue_depth += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject(
+                    "queue_timeout",
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "Tempo de espera na fila esgotado. Tente novamente em instantes."
+                )
+            finally:
+                self.queue_depth -= 1
+
+            self.in_flight += 1
+            self.admitted_total += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+                self._slots.release()
+        finally:
+            self._clients[client] -= 1
+            if not self._clients[client]:
+                del self._clients[client]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Retorna um retrato das métricas de admissão"""
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted_total": self.admitted_total,
+            "shed_total": sum(self.shed_total.values()),
+            "shed_by_reason": dict(self.shed_total),
+            "limits": {
+                "max_concurrent": self.max_concurrent,
+                "max_per_client": self.max_per_client,
+                "queue_size": self.queue_size,
+                "queue_timeout": self.queue_timeout
+            }
+        }
+
+
+# Instância global do controle de admissão
+search_admission = AdmissionController()
@@ -29,3 +29,20 @@ CORS_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
+
+# Configurações de controle de admissão (/api/search)
+SEARCH_MAX_CONCURRENT = int(os.getenv("SEARCH_MAX_CONCURRENT", "8"))    # buscas simultâneas (global)
+SEARCH_MAX_PER_CLIENT = int(os.getenv("SEARCH_MAX_PER_CLIENT", "2"))    # buscas simultâneas por IP/API key
+SEARCH_QUEUE_SIZE = int(os.getenv("SEARCH_QUEUE_SIZE", "16"))           # máximo de buscas aguardando vaga
+SEARCH_QUEUE_TIMEOUT = float(os.getenv("SEARCH_QUEUE_TIMEOUT", "2.0"))  # segundos de espera na fila
+SEARCH_RETRY_AFTER = int(os.getenv("SEARCH_RETRY_AFTER", "1"))          # valor do header Retry-After (segundos)
+SEARCH_HEAVY_RADIUS = int(os.getenv("SEARCH_HEAVY_RADIUS", "20000"))   # raio (m) a partir do qual a busca não aguarda na fila
+# API keys aceitas para limite por chave (separadas por vírgula); demais clientes são limitados por IP
+SEARCH_API_KEYS = {key.strip() for key in os.getenv("SEARCH_API_KEYS", "").split(",") if key.strip()}
+
+# Configurações de favoritos
+FAVORITES_PAGE_SIZE = int(os.getenv("FAVORITES_PAGE_SIZE", "100"))               # itens por página em /api/favorites
+FAVORITES_MAX_PAGE_SIZE = int(os.getenv("FAVORITES_MAX_PAGE_SIZE", "1000"))
+FAVORITES_IMPORT_MAX = int(os.getenv("FAVORITES_IMPORT_MAX", "10000"))            # máximo de linhas por importação
+FAVORITES_IMPORT_MAX_BYTES = int(os.getenv("FAVORITES_IMPORT_MAX_BYTES", str(5 * 1024 * 1024)))  # tamanho máximo do corpo
+FAVORITES_REFRESH_MAX = int(os.getenv("FAVORITES_REFRESH_MAX", "25"))             # favoritos por chamada de /api/favorites/refresh
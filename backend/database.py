@@ -3,7 +3,7 @@ Gerenciamento do banco de dados SQLite
 """
 import sqlite3
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from pathlib import Path
 import config
 
@@ -129,32 +129,174 @@ class Database:
             # Já existe nos favoritos
             return False
     
-    def get_favorites(self) -> List[Dict[str, Any]]:
-        """Retorna a lista de favoritos"""
+    @staticmethod
+    def _favorite_row(row: sqlite3.Row) -> Dict[str, Any]:
+        """Converte uma linha da tabela favorites em dicionário"""
+        return {
+            "id": row["id"],
+            "place_id": row["place_id"],
+            "name": row["name"],
+            "address": row["address"],
+            "phone": row["phone"],
+            "added_at": row["added_at"]
+        }
+    
+    def get_favorites(self, limit: int = 100, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna uma página de favoritos (paginação por keyset)
+        
+        Args:
+            limit: Número máximo de registros
+            after_id: Cursor; retorna apenas favoritos com id menor que este
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT id, place_id, name, address, phone, added_at
-            FROM favorites
-            ORDER BY added_at DESC
-        """)
+        if after_id is None:
+            cursor.execute("""
+                SELECT id, place_id, name, address, phone, added_at
+                FROM favorites
+                ORDER BY id DESC
+                LIMIT ?
+            """, (limit,))
+        else:
+            cursor.execute("""
+                SELECT id, place_id, name, address, phone, added_at
+                FROM favorites
+                WHERE id < ?
+                ORDER BY id DESC
+                LIMIT ?
+            """, (after_id, limit))
         
         rows = cursor.fetchall()
         conn.close()
         
-        favorites = []
-        for row in rows:
-            favorites.append({
-                "id": row["id"],
-                "place_id": row["place_id"],
-                "name": row["name"],
-                "address": row["address"],
-                "phone": row["phone"],
-                "added_at": row["added_at"]
-            })
+        return [self._favorite_row(row) for row in rows]
+    
+    def iter_favorites(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre todos os favoritos em lotes paginados por keyset
+        
+        Cada lote usa uma consulta curta em conexão própria, de modo que um
+        consumidor lento (ex: StreamingResponse) não mantém o banco bloqueado.
+        """
+        after_id = None
+        while True:
+            rows = self.get_favorites(limit=batch_size, after_id=after_id)
+            yield from rows
+            if len(rows) < batch_size:
+                break
+            after_id = rows[-1]["id"]
+    
+    def import_favorites(self, favorites: List[Dict[str, Any]],
+                         overwrite: bool = False) -> Dict[str, Any]:
+        """
+        Importa favoritos em lote numa única transação
+        
+        Args:
+            favorites: Lista de dicionários com place_id, name, address e phone
+            overwrite: Se True, atualiza favoritos já existentes; senão os mantém
+            
+        Returns:
+            Contagem de inseridos/atualizados e lista de conflitos por linha
+            (índice na entrada, place_id e motivo). Com overwrite, favoritos
+            existentes entram na contagem de atualizados, não nos conflitos.
+        """
+        conflicts = []
+        unique: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        for index, favorite in enumerate(favorites):
+            place_id = favorite["place_id"]
+            if place_id in unique:
+                # Duplicado dentro do próprio lote: prevalece a última ocorrência
+                conflicts.append({"index": unique[place_id][0], "place_id": place_id, "reason": "duplicate"})
+            unique[place_id] = (index, favorite)
+        
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            # Trava de escrita desde a verificação até a gravação
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            existing = set()
+            place_ids = list(unique)
+            for start in range(0, len(place_ids), 500):
+                chunk = place_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT place_id FROM favorites WHERE place_id IN ({placeholders})",
+                    chunk
+                )
+                existing.update(row["place_id"] for row in cursor.fetchall())
+            
+            if not overwrite:
+                for place_id in existing:
+                    conflicts.append({"index": unique[place_id][0], "place_id": place_id, "reason": "exists"})
+            
+            if overwrite:
+                sql = """
+                    INSERT INTO favorites (place_id, name, address, phone)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(place_id) DO UPDATE SET
+                        name = excluded.name,
+                        address = excluded.address,
+                        phone = excluded.phone
+                """
+            else:
+                sql = """
+                    INSERT INTO favorites (place_id, name, address, phone)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(place_id) DO NOTHING
+                """
+            
+            cursor.executemany(sql, (
+                (f["place_id"], f["name"], f["address"], f.get("phone"))
+                for _, f in unique.values()
+            ))
+            inserted = len(unique) - len(existing) if overwrite else cursor.rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        conflicts.sort(key=lambda c: c["index"])
+        return {
+            "inserted": inserted,
+            "updated": len(existing) if overwrite else 0,
+            "conflicts": conflicts
+        }
+    
+    def update_favorites(self, favorites: List[Dict[str, Any]]) -> int:
+        """
+        Atualiza nome, endereço e telefone de favoritos em lote
+        
+        Args:
+            favorites: Lista de dicionários com place_id, name, address e phone
+            
+        Returns:
+            Número de favoritos atualizados
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                UPDATE favorites
+                SET name = ?, address = ?, phone = ?
+                WHERE place_id = ?
+            """, (
+                (f["name"], f["address"], f.get("phone"), f["place_id"])
+                for f in favorites
+            ))
+            updated = cursor.rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
         
-        return favorites
+        return updated
     
     def remove_favorite(self, place_id: str) -> bool:
         """Remove um estabelecimento dos favoritos"""
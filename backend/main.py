@@ -2,19 +2,26 @@
 API REST do Sistema Atlas
 Microsserviço para localização de estabelecimentos próximos
 """
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
+import csv
+import io
+import json
+from pydantic import ValidationError
 import config
 from models import (
     SearchRequest, SearchResponse, HealthResponse, 
-    Location, SearchHistory
+    Location, SearchHistory, Favorite
 )
 from services import GoogleMapsService
 from database import db
+from admission import search_admission
 
 # Inicializar aplicação FastAPI
 app = FastAPI(
@@ -59,11 +66,56 @@ async def health_check():
     )
 
 
+@app.get("/api/metrics", tags=["System"])
+async def get_metrics():
+    """
+    Métricas do controle de admissão de buscas
+    
+    Returns:
+        Buscas em andamento, profundidade da fila e total de requisições descartadas
+    """
+    return {"search": search_admission.metrics()}
+
+
+def _run_search(request: SearchRequest) -> SearchResponse:
+    """Executa a busca e registra no histórico (bloqueante, roda em threadpool)"""
+    # Inicializar serviço do Google Maps
+    maps_service = GoogleMapsService()
+    
+    # Buscar estabelecimentos
+    establishments = maps_service.search_nearby(
+        query=request.query,
+        latitude=request.latitude,
+        longitude=request.longitude,
+        radius=request.radius
+    )
+    
+    # Salvar busca no histórico
+    db.save_search(
+        query=request.query,
+        latitude=request.latitude,
+        longitude=request.longitude,
+        radius=request.radius,
+        results_count=len(establishments)
+    )
+    
+    # Preparar resposta
+    return SearchResponse(
+        results=establishments,
+        count=len(establishments),
+        query=request.query,
+        user_location=Location(lat=request.latitude, lng=request.longitude)
+    )
+
+
 @app.post("/api/search", response_model=SearchResponse, tags=["Search"])
-async def search_establishments(request: SearchRequest):
+async def search_establishments(request: SearchRequest, http_request: Request):
     """
     Busca estabelecimentos próximos
     
+    As buscas passam pelo controle de admissão: acima dos limites de
+    concorrência a requisição é rejeitada com 429/503 e header Retry-After.
+    
     Args:
         request: Dados da busca (query, latitude, longitude, radius)
         
@@ -71,7 +123,7 @@ async def search_establishments(request: SearchRequest):
         Lista de estabelecimentos encontrados com informações de contato
         
     Raises:
-        HTTPException: Se houver erro na busca ou API não configurada
+        HTTPException: Se houver erro na busca, API não configurada ou serviço sobrecarregado
     """
     # Verificar se API Key está configurada
     if not config.GOOGLE_MAPS_API_KEY:
@@ -80,47 +132,27 @@ async def search_establishments(request: SearchRequest):
             detail="Google Maps API Key não configurada. Configure a variável de ambiente GOOGLE_MAPS_API_KEY."
         )
     
-    try:
-        # Inicializar serviço do Google Maps
-        maps_service = GoogleMapsService()
-        
-        # Buscar estabelecimentos
-        establishments = maps_service.search_nearby(
-            query=request.query,
-            latitude=request.latitude,
-            longitude=request.longitude,
-            radius=request.radius
-        )
-        
-        # Salvar busca no histórico
-        db.save_search(
-            query=request.query,
-            latitude=request.latitude,
-            longitude=request.longitude,
-            radius=request.radius,
-            results_count=len(establishments)
-        )
-        
-        # Preparar resposta
-        response = SearchResponse(
-            results=establishments,
-            count=len(establishments),
-            query=request.query,
-            user_location=Location(lat=request.latitude, lng=request.longitude)
-        )
-        
-        return response
-        
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao buscar estabelecimentos: {str(e)}"
-        )
+    client = search_admission.client_key(http_request)
+    heavy = (request.radius or config.DEFAULT_RADIUS) >= config.SEARCH_HEAVY_RADIUS
+    
+    async with search_admission.admit(
+        client, heavy=heavy,
+        heavy_detail="Serviço sobrecarregado. Reduza o raio de busca ou tente novamente em instantes."
+    ):
+        try:
+            # Executar fora do event loop para não bloquear endpoints leves
+            return await run_in_threadpool(_run_search, request)
+            
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erro ao buscar estabelecimentos: {str(e)}"
+            )
 
 
 @app.get("/api/history", tags=["History"])
@@ -148,18 +180,27 @@ async def get_search_history(limit: int = 50):
 
 
 @app.get("/api/favorites", tags=["Favorites"])
-async def get_favorites():
+async def get_favorites(
+    limit: int = Query(config.FAVORITES_PAGE_SIZE, ge=1, le=config.FAVORITES_MAX_PAGE_SIZE),
+    cursor: Optional[int] = None
+):
     """
-    Retorna lista de estabelecimentos favoritos
+    Retorna lista de estabelecimentos favoritos (paginada)
     
+    Args:
+        limit: Número máximo de registros por página
+        cursor: Valor de next_cursor retornado pela página anterior
+        
     Returns:
-        Lista de favoritos
+        Página de favoritos e cursor para a próxima página (null na última)
     """
     try:
-        favorites = db.get_favorites()
+        favorites = db.get_favorites(limit=limit, after_id=cursor)
+        next_cursor = favorites[-1]["id"] if len(favorites) == limit else None
         return {
             "favorites": favorites,
-            "count": len(favorites)
+            "count": len(favorites),
+            "next_cursor": next_cursor
         }
     except Exception as e:
         raise HTTPException(
@@ -200,6 +241,250 @@ async def add_favorite(place_id: str, name: str, address: str, phone: str = None
         )
 
 
+FAVORITE_FIELDS = ["place_id", "name", "address", "phone"]
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_favorites_payload(body: bytes, content_type: str) -> list:
+    """Lê o corpo da importação (JSON ou CSV) como lista de dicionários"""
+    if "csv" in content_type:
+        reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+        return [{field: row.get(field) for field in FAVORITE_FIELDS} for row in reader]
+    
+    data = json.loads(body)
+    if isinstance(data, dict):
+        data = data.get("favorites")
+    if not isinstance(data, list):
+        raise ValueError("Esperada uma lista de favoritos")
+    return data
+
+
+def _run_favorites_import(body: bytes, content_type: str, overwrite: bool) -> dict:
+    """Interpreta, valida e grava a importação de favoritos (bloqueante, roda em threadpool)"""
+    try:
+        rows = _parse_favorites_payload(body, content_type)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Conteúdo de importação inválido: {str(e)}"
+        )
+    
+    if len(rows) > config.FAVORITES_IMPORT_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {config.FAVORITES_IMPORT_MAX} favoritos por importação"
+        )
+    
+    valid = []
+    indexes = []
+    invalid = []
+    for index, row in enumerate(rows):
+        try:
+            if isinstance(row, dict) and not row.get("phone"):
+                row = {**row, "phone": None}
+            valid.append(Favorite.model_validate(row).model_dump())
+            indexes.append(index)
+        except ValidationError as e:
+            place_id = row.get("place_id") if isinstance(row, dict) else None
+            invalid.append({
+                "index": index,
+                "place_id": place_id,
+                "reason": "invalid",
+                "errors": e.errors(include_url=False, include_context=False)
+            })
+    
+    result = db.import_favorites(valid, overwrite)
+    
+    # Mapear índices das linhas válidas de volta para a entrada original
+    for conflict in result["conflicts"]:
+        conflict["index"] = indexes[conflict["index"]]
+    result["conflicts"] = sorted(result["conflicts"] + invalid, key=lambda c: c["index"])
+    result["received"] = len(rows)
+    return result
+
+
+async def _read_limited_body(request: Request, max_bytes: int) -> bytes:
+    """Lê o corpo da requisição rejeitando com 413 acima de max_bytes"""
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Corpo da importação excede {max_bytes} bytes"
+    )
+    
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+    
+    # Sem Content-Length confiável (ex: chunked), limitar durante a leitura
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+@app.post("/api/favorites/import", tags=["Favorites"])
+async def import_favorites(request: Request, overwrite: bool = False):
+    """
+    Importa favoritos em lote (JSON ou CSV)
+    
+    O corpo pode ser uma lista JSON de objetos (ou {"favorites": [...]}) ou um
+    CSV com cabeçalho place_id,name,address,phone (Content-Type: text/csv).
+    Todas as linhas válidas são gravadas numa única transação.
+    
+    Args:
+        overwrite: Se True, atualiza favoritos já existentes
+        
+    Returns:
+        Contagem de inseridos/atualizados e conflitos por linha
+        (duplicate, exists ou invalid)
+    """
+    body = await _read_limited_body(request, config.FAVORITES_IMPORT_MAX_BYTES)
+    
+    try:
+        return await run_in_threadpool(
+            _run_favorites_import, body, request.headers.get("content-type", ""), overwrite
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao importar favoritos: {str(e)}"
+        )
+
+
+@app.get("/api/favorites/export", tags=["Favorites"])
+async def export_favorites(format: str = Query("json", pattern="^(json|csv)$")):
+    """
+    Exporta todos os favoritos em streaming (JSON ou CSV)
+    
+    As linhas são lidas em lotes paginados por keyset e enviadas em blocos de
+    até 64 KB, sem montar a lista completa em memória.
+    
+    Args:
+        format: "json" ou "csv"
+    """
+    rows = db.iter_favorites()
+    
+    if format == "csv":
+        def generate():
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=FAVORITE_FIELDS + ["added_at"],
+                                    extrasaction="ignore")
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        
+        return StreamingResponse(
+            generate(),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=favorites.csv"}
+        )
+    
+    def generate():
+        buffer = io.StringIO()
+        buffer.write("[")
+        for position, row in enumerate(rows):
+            if position:
+                buffer.write(",")
+            buffer.write(json.dumps(row, ensure_ascii=False))
+            if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        buffer.write("]")
+        yield buffer.getvalue()
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/json",
+        headers={"Content-Disposition": "attachment; filename=favorites.json"}
+    )
+
+
+def _run_favorites_refresh(limit: int, after_id: Optional[int]) -> dict:
+    """Atualiza uma página de favoritos com os detalhes do Google Maps (bloqueante)"""
+    maps_service = GoogleMapsService()
+    favorites = db.get_favorites(limit=limit, after_id=after_id)
+    
+    refreshed = []
+    not_found = []
+    failed = []
+    for favorite in favorites:
+        try:
+            details = maps_service.get_place_details(favorite["place_id"], raise_errors=True)
+        except Exception as e:
+            failed.append({"place_id": favorite["place_id"], "error": str(e)})
+            continue
+        if not details:
+            not_found.append(favorite["place_id"])
+            continue
+        refreshed.append({
+            "place_id": favorite["place_id"],
+            "name": details.get("name") or favorite["name"],
+            "address": details.get("formatted_address") or favorite["address"],
+            "phone": details.get("formatted_phone_number") or favorite["phone"]
+        })
+    
+    updated = db.update_favorites(refreshed) if refreshed else 0
+    return {
+        "checked": len(favorites),
+        "updated": updated,
+        "not_found": not_found,
+        "failed": failed,
+        "next_cursor": favorites[-1]["id"] if len(favorites) == limit else None
+    }
+
+
+@app.post("/api/favorites/refresh", tags=["Favorites"])
+async def refresh_favorites(
+    http_request: Request,
+    limit: int = Query(config.FAVORITES_REFRESH_MAX, ge=1, le=config.FAVORITES_REFRESH_MAX),
+    cursor: Optional[int] = None
+):
+    """
+    Atualiza favoritos em lote a partir dos detalhes do Google Maps
+    
+    Processa uma página por chamada (no máximo FAVORITES_REFRESH_MAX favoritos,
+    mesma paginação de GET /api/favorites) e grava as alterações numa única
+    transação. Por consultar a API externa uma vez por favorito, passa pelo
+    controle de admissão como busca cara.
+    
+    Args:
+        limit: Número de favoritos a atualizar nesta chamada
+        cursor: Valor de next_cursor retornado pela chamada anterior
+        
+    Returns:
+        Quantidade verificada/atualizada, place_ids inexistentes no Google Maps,
+        consultas que falharam e próximo cursor
+    """
+    if not config.GOOGLE_MAPS_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Google Maps API Key não configurada. Configure a variável de ambiente GOOGLE_MAPS_API_KEY."
+        )
+    
+    client = search_admission.client_key(http_request)
+    
+    async with search_admission.admit(
+        client, heavy=True,
+        heavy_detail="Serviço sobrecarregado. Reduza o limit da atualização ou tente novamente em instantes."
+    ):
+        try:
+            return await run_in_threadpool(_run_favorites_refresh, limit, cursor)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erro ao atualizar favoritos: {str(e)}"
+            )
+
+
 @app.delete("/api/favorites/{place_id}", tags=["Favorites"])
 async def remove_favorite(place_id: str):
     """
@@ -56,3 +56,11 @@ class HealthResponse(BaseModel):
     service: str
     timestamp: datetime
     google_maps_configured: bool
+
+
+class Favorite(BaseModel):
+    """Modelo para estabelecimento favorito (importação em lote)"""
+    place_id: str = Field(..., min_length=1, max_length=300, description="ID do lugar no Google Maps")
+    name: str = Field(..., min_length=1, max_length=300, description="Nome do estabelecimento")
+    address: str = Field(..., min_length=1, max_length=500, description="Endereço completo")
+    phone: Optional[str] = Field(None, max_length=50, description="Número de telefone")
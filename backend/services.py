@@ -66,12 +66,14 @@ class GoogleMapsService:
         except requests.exceptions.RequestException as e:
             raise Exception(f"Erro ao conectar com Google Maps API: {str(e)}")
     
-    def get_place_details(self, place_id: str) -> Optional[Dict[str, Any]]:
+    def get_place_details(self, place_id: str, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
         """
         Obtém detalhes completos de um estabelecimento
         
         Args:
             place_id: ID do lugar no Google Maps
+            raise_errors: Se True, falhas de rede ou da API geram exceção em vez
+                de retornar None (None passa a indicar lugar inexistente)
             
         Returns:
             Dicionário com detalhes do estabelecimento
@@ -92,9 +94,13 @@ class GoogleMapsService:
             
             if data.get("status") == "OK":
                 return data.get("result")
+            if raise_errors and data.get("status") not in ("NOT_FOUND", "ZERO_RESULTS", "INVALID_REQUEST"):
+                raise Exception(f"Erro na API do Google Maps: {data.get('status')}")
             return None
             
-        except requests.exceptions.RequestException:
+        except requests.exceptions.RequestException as e:
+            if raise_errors:
+                raise Exception(f"Erro ao conectar com Google Maps API: {str(e)}")
             return None
     
     def _parse_place(self, place: Dict[str, Any], user_location: tuple) -> Optional[Establishment]: